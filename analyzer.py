@@ -5,46 +5,52 @@ Analyzes AWS CloudTrail logs using Groq AI (Llama3)
 and generates professional security reports
 """
 
-import json
+import asyncio
+import html
+import logging
 import os
+import re
 import sys
 import datetime
-from groq import Groq
+import functools
+import hashlib
+from collections import Counter
+from pathlib import Path
+import ijson
+import orjson
+from groq import APIError, AsyncGroq
 from dotenv import load_dotenv
+from cache import ResponseCache, event_hash, event_signature
 
 # Load API key from .env file
 load_dotenv()
 
-# Initialize Groq AI client
-client = Groq(api_key=os.getenv('GROQ_API_KEY'))
+# Per-event details are logged at INFO - set LOG_LEVEL=INFO to see them
+logger = logging.getLogger(__name__)
 
+# Requests per minute allowed by your Groq plan (0 = no client-side limit)
+GROQ_RPM = int(os.getenv('GROQ_RPM', '30'))
 
-def load_cloudtrail_logs(filepath):
-    """Load CloudTrail log file"""
-    print(f"📂 Loading logs from: {filepath}")
-    with open(filepath, 'r') as f:
-        data = json.load(f)
-    events = data.get('Records', [])
-    print(f"✅ Loaded {len(events)} security events")
-    return events
+# Retries on 429/5xx - the SDK backs off exponentially with jitter
+# and honors the Retry-After header
+GROQ_MAX_RETRIES = 6
 
+# Initialize Groq AI client
+aclient = AsyncGroq(
+    api_key=os.getenv('GROQ_API_KEY'),
+    max_retries=GROQ_MAX_RETRIES
+)
 
-def analyze_event_with_ai(event):
-    """Use Groq AI to analyze a single security event"""
+MODEL = "llama-3.3-70b-versatile"
+MAX_TOKENS = 500
 
-    event_json = json.dumps(event, indent=2)
+# Everything except the event JSON is identical for every request,
+# so Groq can serve this prefix from its prompt cache
+SYSTEM_MSG = {
+    "role": "system",
+    "content": """You are a cloud security analyst. Analyze AWS CloudTrail events and identify security risks. Always respond in exactly the format requested.
 
-    response = client.chat.completions.create(
-        model="llama-3.3-70b-versatile",
-        max_tokens=500,
-        messages=[
-            {
-                "role": "system",
-                "content": "You are a cloud security analyst. Analyze AWS CloudTrail events and identify security risks. Always respond in exactly the format requested."
-            },
-            {
-                "role": "user",
-                "content": f"""Analyze this AWS CloudTrail event and provide:
+For each CloudTrail event provide:
 
 1. SEVERITY: (CRITICAL/HIGH/MEDIUM/LOW/INFO)
 2. FINDING: One sentence describing what happened
@@ -55,86 +61,232 @@ Format your response EXACTLY like this with no extra text:
 SEVERITY: [level]
 FINDING: [one sentence]
 RISK: [one sentence]
-ACTION: [one sentence]
+ACTION: [one sentence]"""
+}
+USER_PREAMBLE = """Analyze this AWS CloudTrail event.
 
 CloudTrail Event:
-{event_json}"""
-            }
-        ]
-    )
+"""
 
-    return response.choices[0].message.content
+# Chat completion call with the per-run settings already bound
+create_completion = functools.partial(
+    aclient.chat.completions.create,
+    model=MODEL,
+    max_tokens=MAX_TOKENS
+)
+
+# Maximum number of Groq requests in flight at once
+MAX_CONCURRENCY = 16
+
+# Where the HTML report is written
+REPORT_PATH = Path("reports") / "security_report.html"
+
+# Seconds between status checks when using the Groq Batch API
+BATCH_POLL_SECONDS = 30
+
+# CloudTrail fields the model actually needs to judge an event
+PROMPT_FIELDS = (
+    'eventName', 'eventSource', 'eventTime', 'awsRegion',
+    'sourceIPAddress', 'userAgent', 'errorCode', 'errorMessage',
+    'readOnly', 'requestParameters'
+)
+IDENTITY_FIELDS = ('type', 'userName', 'arn', 'invokedBy')
+
+# Only flat values are kept from these (login result, MFAUsed, ...)
+SUMMARY_FIELDS = ('responseElements', 'additionalEventData')
+
+# Fingerprint of everything that shapes the AI's answer - cached
+# responses from an older model or prompt are never reused
+PROMPT_VERSION = hashlib.sha256(orjson.dumps([
+    MODEL, MAX_TOKENS, SYSTEM_MSG, USER_PREAMBLE,
+    PROMPT_FIELDS, IDENTITY_FIELDS, SUMMARY_FIELDS
+])).hexdigest()[:16]
+
+# Severity levels, most severe first
+SEVERITY_LEVELS = ('CRITICAL', 'HIGH', 'MEDIUM', 'LOW', 'INFO')
+
+# Report color for each severity level
+SEVERITY_COLORS = {
+    'CRITICAL': '#dc3545',
+    'HIGH':     '#fd7e14',
+    'MEDIUM':   '#ffc107',
+    'LOW':      '#17a2b8',
+    'INFO':     '#28a745'
+}
+
+# Fallback values when the AI response leaves a field out
+DEFAULT_ANALYSIS = {
+    'severity': 'INFO',
+    'finding': 'Event analyzed',
+    'risk': 'Review recommended',
+    'action': 'Monitor activity'
+}
+
+# Shown for events the AI never analyzed (e.g. a failed batch item) so
+# they can't be mistaken for benign INFO events
+FAILED_ANALYSIS = {
+    'severity': 'UNKNOWN',
+    'finding': 'AI analysis failed',
+    'risk': 'Event was not analyzed - review it manually',
+    'action': 'Re-run the analyzer or investigate this event by hand'
+}
+
+# One "LABEL: value" line of the AI response
+_PARSE_RE = re.compile(
+    r'^[ \t]*(SEVERITY|FINDING|RISK|ACTION):[ \t]*(.*?)\s*$',
+    re.MULTILINE
+)
+_SEV_RE = re.compile('|'.join(SEVERITY_LEVELS))
+
+# Token bucket for wait_for_rate_limit() - starts full so small runs go at once
+_rate_tokens = float(GROQ_RPM)
+_rate_refilled_at = None
+
+# Prompt usage for this run (cached = served from Groq's prefix cache)
+usage_stats = {
+    'prompt_tokens': 0, 'cached_tokens': 0,
+    'prompt_event_bytes': 0
+}
 
 
-def parse_ai_response(response_text):
-    """Parse AI response into structured data"""
-    lines = response_text.strip().split('\n')
-    result = {
-        'severity': 'INFO',
-        'finding': 'Event analyzed',
-        'risk': 'Review recommended',
-        'action': 'Monitor activity'
+def load_cloudtrail_logs(filepath):
+    """Stream events one by one out of a CloudTrail log file"""
+    print(f"📂 Loading logs from: {filepath}")
+    # ijson picks its fastest backend (yajl2_c) automatically and never
+    # holds the whole Records array in memory at once
+    with open(filepath, 'rb') as f:
+        yield from ijson.items(f, 'Records.item', use_float=True)
+
+
+def _project_event(event):
+    """Trim an event down to the fields used for analysis"""
+    projected = {k: event[k] for k in PROMPT_FIELDS if k in event}
+
+    identity = event.get('userIdentity') or {}
+    projected['userIdentity'] = {
+        k: identity[k] for k in IDENTITY_FIELDS if k in identity
     }
 
-    for line in lines:
-        line = line.strip()
-        if line.startswith('SEVERITY:'):
-            severity = line.replace('SEVERITY:', '').strip().upper()
-            for sev in ['CRITICAL', 'HIGH', 'MEDIUM', 'LOW', 'INFO']:
-                if sev in severity:
-                    result['severity'] = sev
-                    break
-        elif line.startswith('FINDING:'):
-            result['finding'] = line.replace('FINDING:', '').strip()
-        elif line.startswith('RISK:'):
-            result['risk'] = line.replace('RISK:', '').strip()
-        elif line.startswith('ACTION:'):
-            result['action'] = line.replace('ACTION:', '').strip()
+    # Nested blobs here are credentials, ETags, etc. - skip them
+    for field in SUMMARY_FIELDS:
+        values = event.get(field)
+        if isinstance(values, dict):
+            flat = {k: v for k, v in values.items()
+                    if not isinstance(v, (dict, list))}
+            if flat:
+                projected[field] = flat
 
-    return result
+    return projected
 
 
-def get_severity_color(severity):
-    """Get color for severity level"""
-    colors = {
-        'CRITICAL': '#dc3545',
-        'HIGH':     '#fd7e14',
-        'MEDIUM':   '#ffc107',
-        'LOW':      '#17a2b8',
-        'INFO':     '#28a745'
-    }
-    return colors.get(severity.upper(), '#6c757d')
+def build_messages(event):
+    """Build the chat messages for a single security event"""
 
+    event_bytes = orjson.dumps(_project_event(event))
+    usage_stats['prompt_event_bytes'] += len(event_bytes)
 
-def generate_html_report(events, analyses):
-    """Generate professional HTML security report"""
+    # Serializing the full event again is only worth it when debugging
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("%s: %d bytes sent (untrimmed: %d bytes)",
+                     event.get('eventName', 'Unknown'), len(event_bytes),
+                     len(orjson.dumps(event, option=orjson.OPT_INDENT_2)))
+
+    return [
+        SYSTEM_MSG,
+        {"role": "user", "content": USER_PREAMBLE + event_bytes.decode('utf-8')}
+    ]
 
-    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-    # Count severities
-    severity_counts = {
-        'CRITICAL': 0, 'HIGH': 0,
-        'MEDIUM': 0, 'LOW': 0, 'INFO': 0
+def build_chat_request(event):
+    """Build the full chat completion payload (used for batch jobs)"""
+    return {
+        "model": MODEL,
+        "max_tokens": MAX_TOKENS,
+        "messages": build_messages(event)
     }
-    for analysis in analyses:
-        sev = analysis['severity'].upper()
-        if sev in severity_counts:
-            severity_counts[sev] += 1
-
-    # Build events HTML
-    events_html = ""
-    for i, (event, analysis) in enumerate(zip(events, analyses)):
-        severity = analysis['severity'].upper()
-        color = get_severity_color(severity)
 
-        events_html += f"""
+
+def record_usage(usage):
+    """Add a response's prompt token usage to usage_stats"""
+    if not usage:
+        return
+    if not isinstance(usage, dict):
+        usage = usage.model_dump()
+    details = usage.get('prompt_tokens_details') or {}
+    usage_stats['prompt_tokens'] += usage.get('prompt_tokens') or 0
+    usage_stats['cached_tokens'] += details.get('cached_tokens') or 0
+
+
+async def wait_for_rate_limit():
+    """Token bucket: burst up to GROQ_RPM requests, then refill per minute"""
+    global _rate_tokens, _rate_refilled_at
+    if GROQ_RPM <= 0:
+        return
+    loop = asyncio.get_running_loop()
+    while True:
+        now = loop.time()
+        if _rate_refilled_at is not None:
+            _rate_tokens = min(
+                GROQ_RPM,
+                _rate_tokens + (now - _rate_refilled_at) * GROQ_RPM / 60
+            )
+        _rate_refilled_at = now
+        if _rate_tokens >= 1:
+            _rate_tokens -= 1
+            return
+        await asyncio.sleep((1 - _rate_tokens) * 60 / GROQ_RPM)
+
+
+async def analyze_event_with_ai(event, cache=None):
+    """Use Groq AI to analyze a single security event"""
+
+    if cache is not None:
+        cached = cache.lookup(event)
+        if cached is not None:
+            return cached
+
+    await wait_for_rate_limit()
+    response = await create_completion(messages=build_messages(event))
+    content = response.choices[0].message.content
+    record_usage(response.usage)
+
+    if cache is not None:
+        cache.store(event, content)
+
+    return content
+
+
+def parse_ai_response(response_text):
+    """Parse AI response into structured data"""
+    result = dict(DEFAULT_ANALYSIS)
+
+    for label, value in _PARSE_RE.findall(response_text):
+        if label == 'SEVERITY':
+            # "HIGH (potentially CRITICAL)" -> CRITICAL: most severe wins
+            severity = min(_SEV_RE.findall(value.upper()),
+                           key=SEVERITY_LEVELS.index, default=None)
+            if severity:
+                result['severity'] = severity
+        else:
+            result[label.lower()] = value
+
+    return result
+
+
+def get_severity_color(severity):
+    """Get color for severity level"""
+    return SEVERITY_COLORS.get(severity.upper(), '#6c757d')
+
+
+# HTML for one event card, filled by write_html_report()
+EVENT_TEMPLATE = """
         <div class="event-card">
             <div class="event-header" style="border-left: 5px solid {color}">
                 <div class="event-info">
-                    <span class="event-name">{event.get('eventName', 'Unknown')}</span>
-                    <span class="event-user">👤 {event.get('userIdentity', {}).get('userName', 'Unknown')}</span>
-                    <span class="event-time">🕐 {event.get('eventTime', 'Unknown')}</span>
-                    <span class="event-ip">🌐 {event.get('sourceIPAddress', 'Unknown')}</span>
+                    <span class="event-name">{event_name}</span>
+                    <span class="event-user">👤 {user_name}</span>
+                    <span class="event-time">🕐 {event_time}</span>
+                    <span class="event-ip">🌐 {source_ip}</span>
                 </div>
                 <span class="severity-badge" style="background-color: {color}">
                     {severity}
@@ -142,19 +294,55 @@ def generate_html_report(events, analyses):
             </div>
             <div class="event-analysis">
                 <div class="analysis-item">
-                    <strong>🔍 Finding:</strong> {analysis['finding']}
+                    <strong>🔍 Finding:</strong> {finding}
                 </div>
                 <div class="analysis-item">
-                    <strong>⚠️ Risk:</strong> {analysis['risk']}
+                    <strong>⚠️ Risk:</strong> {risk}
                 </div>
                 <div class="analysis-item">
-                    <strong>✅ Action:</strong> {analysis['action']}
+                    <strong>✅ Action:</strong> {action}
                 </div>
             </div>
         </div>
         """
 
-    html = f"""<!DOCTYPE html>
+
+def _event_rows(events, analyses):
+    """Yield the escaped values for each event card"""
+    for event, analysis in zip(events, analyses):
+        severity = analysis['severity'].upper()
+        identity = event.get('userIdentity') or {}
+        yield {
+            'color': get_severity_color(severity),
+            'severity': html.escape(severity),
+            'event_name': html.escape(str(event.get('eventName', 'Unknown'))),
+            'user_name': html.escape(str(identity.get('userName', 'Unknown'))),
+            'event_time': html.escape(str(event.get('eventTime', 'Unknown'))),
+            'source_ip': html.escape(str(event.get('sourceIPAddress', 'Unknown'))),
+            'finding': html.escape(analysis['finding']),
+            'risk': html.escape(analysis['risk']),
+            'action': html.escape(analysis['action'])
+        }
+
+
+def count_severities(analyses):
+    """Count analyses per severity level in a single pass"""
+    counts = Counter(analysis['severity'].upper() for analysis in analyses)
+    for sev in SEVERITY_LEVELS:
+        counts.setdefault(sev, 0)
+    return counts
+
+
+def write_html_report(events, analyses, path, severity_counts=None):
+    """Stream professional HTML security report to path"""
+
+    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    if severity_counts is None:
+        severity_counts = count_severities(analyses)
+
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(f"""<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -336,9 +524,14 @@ def generate_html_report(events, analyses):
         </div>
 
         <h2 class="section-title">📋 Security Events Analysis</h2>
+""")
 
-        {events_html}
-    </div>
+        # Write each event card straight to the file
+        f.writelines(
+            EVENT_TEMPLATE.format_map(row) for row in _event_rows(events, analyses)
+        )
+
+        f.write("""    </div>
 
     <div class="footer">
         <p>CloudSecure AI Security Analyzer | Built by Abhi |
@@ -346,12 +539,148 @@ def generate_html_report(events, analyses):
         <p>🔒 This report is confidential</p>
     </div>
 </body>
-</html>"""
+</html>""")
 
-    return html
 
+def dedupe_events(events, key=event_hash):
+    """Group events by key -> (one event per group, indices per group)"""
+    groups = {}
+    for i, event in enumerate(events):
+        groups.setdefault(key(event), []).append(i)
+    index_groups = list(groups.values())
+    return [events[idxs[0]] for idxs in index_groups], index_groups
 
-def main():
+
+async def analyze_events(events, cache=None):
+    """Analyze all events concurrently, keeping results in event order"""
+    sem = asyncio.Semaphore(MAX_CONCURRENCY)
+    total = len(events)
+
+    async def analyze(i, event):
+        event_name = event.get('eventName', 'Unknown')
+        try:
+            async with sem:
+                ai_response = await analyze_event_with_ai(event, cache)
+        except APIError as e:
+            # One bad request (413, 400, retries exhausted) shouldn't
+            # throw away every other event's result
+            logger.warning("Event %d/%d (%s) failed: %s",
+                           i + 1, total, event_name, e)
+            return dict(FAILED_ANALYSIS)
+        analysis = parse_ai_response(ai_response)
+        logger.info("Analyzed event %d/%d: %s → Severity: %s",
+                    i + 1, total, event_name, analysis['severity'])
+        return analysis
+
+    analyses = await asyncio.gather(
+        *[analyze(i, event) for i, event in enumerate(events)]
+    )
+    failed = sum(1 for analysis in analyses if analysis['severity'] == 'UNKNOWN')
+    print(f"✅ Analyzed {total - failed} events")
+    if failed:
+        print(f"⚠️  {failed} of {total} Groq requests failed - "
+              f"marked as UNKNOWN in the report")
+    return analyses
+
+
+async def analyze_events_batch(events, cache=None):
+    """Analyze all events with a single Groq Batch API job"""
+
+    responses = {}
+    pending = []
+    for i, event in enumerate(events):
+        custom_id = f"evt-{i}"
+        cached = cache.lookup(event) if cache is not None else None
+        if cached is not None:
+            responses[custom_id] = cached
+        else:
+            pending.append((custom_id, event))
+
+    if pending:
+        completed = await run_batch_job(pending)
+        if completed is None:
+            return None
+        for custom_id, event in pending:
+            if custom_id not in completed:
+                continue
+            if cache is not None:
+                cache.store(event, completed[custom_id])
+            responses[custom_id] = completed[custom_id]
+
+    return [
+        parse_ai_response(responses[f"evt-{i}"])
+        if f"evt-{i}" in responses else dict(FAILED_ANALYSIS)
+        for i in range(len(events))
+    ]
+
+
+async def run_batch_job(pending):
+    """Submit (custom_id, event) pairs as a Groq batch and wait for results"""
+
+    # One JSONL line per event, same payload as analyze_event_with_ai
+    lines = [
+        orjson.dumps({
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": build_chat_request(event)
+        })
+        for custom_id, event in pending
+    ]
+
+    batch_file = await aclient.files.create(
+        file=("cloudsecure_batch.jsonl", b"\n".join(lines)),
+        purpose="batch"
+    )
+    batch = await aclient.batches.create(
+        input_file_id=batch_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h"
+    )
+    print(f"📦 Submitted batch {batch.id} ({len(pending)} events)")
+
+    while batch.status not in ('completed', 'failed', 'expired', 'cancelled'):
+        print(f"  ⏳ Batch status: {batch.status}")
+        await asyncio.sleep(BATCH_POLL_SECONDS)
+        batch = await aclient.batches.retrieve(batch.id)
+
+    # An expired batch still returns whatever finished within the window
+    if batch.status == 'expired' and batch.output_file_id:
+        print(f"⚠️  Batch {batch.id} expired - using the requests that completed")
+    elif batch.status != 'completed':
+        print(f"❌ ERROR: Batch {batch.id} finished with status: {batch.status}")
+        return None
+
+    # A batch where every request failed has no output file at all
+    output_text = ""
+    if batch.output_file_id:
+        output = await aclient.files.content(batch.output_file_id)
+        output_text = await output.text()
+
+    # Results come back in any order - match them up by custom_id
+    responses = {}
+    for line in output_text.splitlines():
+        if not line.strip():
+            continue
+        result = orjson.loads(line)
+        body = (result.get('response') or {}).get('body') or {}
+        choices = body.get('choices') or []
+        if choices:
+            responses[result['custom_id']] = choices[0]['message']['content']
+            record_usage(body.get('usage'))
+
+    # Items with an error body or no output line at all
+    failed = [custom_id for custom_id, _ in pending if custom_id not in responses]
+    if failed:
+        print(f"⚠️  {len(failed)} of {len(pending)} batch requests failed - "
+              f"marked as UNKNOWN in the report")
+        if batch.error_file_id:
+            print(f"   Details in Groq error file: {batch.error_file_id}")
+
+    return responses
+
+
+async def amain():
     print("=" * 50)
     print("🔐 CloudSecure AI Security Analyzer")
     print("=" * 50)
@@ -364,69 +693,97 @@ def main():
         return
 
     # Check if custom log file provided via command line
-    if len(sys.argv) > 2 and sys.argv[1] == '--file':
-        log_file = sys.argv[2]
+    if '--file' in sys.argv[:-1]:
+        log_file = sys.argv[sys.argv.index('--file') + 1]
         print(f"📂 Using custom log file: {log_file}")
     else:
         log_file = "sample_logs/cloudtrail_events.json"
         print(f"📂 Using sample log file")
 
-    # Check file exists
-    if not os.path.exists(log_file):
+    # Load logs - the report needs every event, so keep them in a list
+    try:
+        events = list(load_cloudtrail_logs(log_file))
+    except FileNotFoundError:
         print(f"❌ ERROR: Log file not found: {log_file}")
         return
-
-    # Load logs
-    events = load_cloudtrail_logs(log_file)
+    print(f"✅ Loaded {len(events)} security events")
 
     # Analyze each event
     print("\n🤖 Analyzing events with Groq AI (Llama3)...")
     print("-" * 50)
 
-    analyses = []
-    for i, event in enumerate(events):
-        event_name = event.get('eventName', 'Unknown')
-        print(f"Analyzing event {i+1}/{len(events)}: {event_name}...")
-
-        ai_response = analyze_event_with_ai(event)
-        analysis = parse_ai_response(ai_response)
-        analyses.append(analysis)
+    similar = '--similar' in sys.argv
+    if similar:
+        print("♻️  Reusing analyses of similar events (--similar)")
 
-        print(f"  → Severity: {analysis['severity']}")
+    # Identical events (ignoring IDs/timestamps) only need one AI call
+    unique_events, index_groups = dedupe_events(
+        events, key=event_signature if similar else event_hash
+    )
+    if len(unique_events) < len(events):
+        print(f"🔁 {len(unique_events)} unique events "
+              f"({len(events) - len(unique_events)} duplicates skipped)")
+
+    with ResponseCache(similar=similar, namespace=PROMPT_VERSION) as cache:
+        if '--batch' in sys.argv:
+            print("📦 Using Groq Batch API")
+            unique_analyses = await analyze_events_batch(unique_events, cache)
+            if unique_analyses is None:
+                return
+        else:
+            unique_analyses = await analyze_events(unique_events, cache)
+
+    # Fan each result back out to every event in its group
+    analyses = [None] * len(events)
+    for idxs, analysis in zip(index_groups, unique_analyses):
+        for i in idxs:
+            analyses[i] = analysis
 
     # Generate report
     print("\n📊 Generating HTML report...")
-    html_report = generate_html_report(events, analyses)
-
-    # Save report
-    report_path = "reports/security_report.html"
-    os.makedirs("reports", exist_ok=True)
+    REPORT_PATH.parent.mkdir(parents=True, exist_ok=True)
+    severity_counts = count_severities(analyses)
+    write_html_report(events, analyses, REPORT_PATH, severity_counts)
 
-    with open(report_path, 'w', encoding='utf-8') as f:
-        f.write(html_report)
-
-    print(f"✅ Report saved: {report_path}")
+    print(f"✅ Report saved: {REPORT_PATH}")
 
     # Print summary
     print("\n" + "=" * 50)
     print("📊 ANALYSIS SUMMARY")
     print("=" * 50)
 
-    severity_counts = {}
-    for analysis in analyses:
-        sev = analysis['severity'].upper()
-        severity_counts[sev] = severity_counts.get(sev, 0) + 1
-
     for severity, count in sorted(severity_counts.items()):
+        if not count:
+            continue
         emoji = {'CRITICAL': '🔴', 'HIGH': '🟠',
                  'MEDIUM': '🟡', 'LOW': '🔵', 'INFO': '🟢'}
         print(f"  {emoji.get(severity, '⚪')} {severity}: {count} events")
 
+    prompt_bytes = usage_stats['prompt_event_bytes']
+    if prompt_bytes:
+        print(f"\n✂️  Event JSON sent to Groq: {prompt_bytes} bytes")
+
+    prompt_tokens = usage_stats['prompt_tokens']
+    cached_tokens = usage_stats['cached_tokens']
+    if prompt_tokens:
+        print(f"\n⚡ Prompt tokens: {prompt_tokens} "
+              f"({cached_tokens} cached, "
+              f"cache hit rate = {cached_tokens / prompt_tokens:.1%})")
+
     print(f"\n✅ Total: {len(events)} events analyzed")
-    print(f"📄 Report: {report_path}")
+    print(f"📄 Report: {REPORT_PATH}")
     print("\n🌐 Open reports/security_report.html in your browser!")
     print("=" * 50)
 
 
+def main():
+    log_level = os.getenv('LOG_LEVEL', 'WARNING').upper()
+    if log_level not in ('DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'):
+        print(f"⚠️  Unknown LOG_LEVEL '{log_level}' - using WARNING")
+        log_level = 'WARNING'
+    logging.basicConfig(level=log_level, format="%(levelname)s %(message)s")
+    asyncio.run(amain())
+
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+On-disk response cache for CloudSecure AI Security Analyzer
+Stores Groq analyses in SQLite so repeat events cost nothing
+"""
+
+import hashlib
+import os
+import sqlite3
+import orjson
+
+# Default location of the cache database
+CACHE_PATH = "cache/responses.db"
+
+# Fields that change for every occurrence of the same action
+VOLATILE_FIELDS = (
+    'eventID', 'requestID', 'sharedEventID',
+    'eventTime', 'eventReceivedTime'
+)
+
+
+def canonical_json(event):
+    """Serialize an event to bytes deterministically, minus volatile fields"""
+    stable = {k: v for k, v in event.items() if k not in VOLATILE_FIELDS}
+    return orjson.dumps(stable, option=orjson.OPT_SORT_KEYS)
+
+
+def event_hash(event, namespace=''):
+    """SHA-256 cache key for a CloudTrail event (within namespace)"""
+    return hashlib.sha256(
+        namespace.encode('utf-8') + b'|' + canonical_json(event)
+    ).hexdigest()
+
+
+def event_signature(event):
+    """Coarse key shared by near-duplicate events (e.g. same call, other IP)"""
+    identity = event.get('userIdentity') or {}
+    # Failed console logins carry no errorCode - the outcome and MFA
+    # flag are what tell a good login from a suspicious one
+    response = event.get('responseElements') or {}
+    extra = event.get('additionalEventData') or {}
+    return '|'.join(str(part or '') for part in (
+        event.get('eventName'),
+        event.get('eventSource'),
+        identity.get('type'),
+        event.get('errorCode'),
+        response.get('ConsoleLogin') if isinstance(response, dict) else None,
+        extra.get('MFAUsed') if isinstance(extra, dict) else None
+    ))
+
+
+class ResponseCache:
+    """SQLite-backed map of event hash -> raw AI response
+
+    With similar=True, events that miss the exact cache can also reuse
+    the analysis of an earlier event with the same event_signature().
+    Entries are scoped to namespace, so a new model or prompt version
+    starts from an empty cache.
+    """
+
+    def __init__(self, path=CACHE_PATH, similar=False, namespace=''):
+        self.similar = similar
+        self.namespace = namespace
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        # WAL lets several analyzer runs read/write the cache at once
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses "
+            "(hash TEXT PRIMARY KEY, response TEXT)"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS similar "
+            "(signature TEXT PRIMARY KEY, response TEXT)"
+        )
+        self.conn.commit()
+
+    def lookup(self, event):
+        """Return a cached response for event, or None on a miss"""
+        response = self.get(event_hash(event, self.namespace))
+        if response is None and self.similar:
+            row = self.conn.execute(
+                "SELECT response FROM similar WHERE signature = ?",
+                (self._signature_key(event),)
+            ).fetchone()
+            response = row[0] if row else None
+        return response
+
+    def store(self, event, response):
+        """Remember the response for event (and its signature)"""
+        self.conn.execute(
+            "INSERT OR REPLACE INTO similar (signature, response) VALUES (?, ?)",
+            (self._signature_key(event), response)
+        )
+        self.set(event_hash(event, self.namespace), response)
+
+    def _signature_key(self, event):
+        return f"{self.namespace}|{event_signature(event)}"
+
+    def get(self, key):
+        """Return the cached response for key, or None on a miss"""
+        row = self.conn.execute(
+            "SELECT response FROM responses WHERE hash = ?", (key,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key, response):
+        """Store a response under key"""
+        self.conn.execute(
+            "INSERT OR REPLACE INTO responses (hash, response) VALUES (?, ?)",
+            (key, response)
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
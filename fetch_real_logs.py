@@ -5,13 +5,38 @@ and save them for analysis
 """
 
 import boto3
-import json
+import orjson
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from botocore.config import Config
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Number of time windows fetched in parallel
+FETCH_WORKERS = 8
+
+def split_time_range(start_time, end_time, parts):
+    """Split [start_time, end_time] into equal back-to-back windows"""
+    step = (end_time - start_time) / parts
+    return [
+        (start_time + step * i, start_time + step * (i + 1))
+        for i in range(parts)
+    ]
+
+def _fetch_window(cloudtrail, start_time, end_time, max_events):
+    """Fetch up to max_events from one time window"""
+    # lookup_events returns at most 50 events per page - follow
+    # NextToken until we have max_events
+    paginator = cloudtrail.get_paginator('lookup_events')
+    page_iter = paginator.paginate(
+        StartTime=start_time,
+        EndTime=end_time,
+        PaginationConfig={'MaxItems': max_events, 'PageSize': 50}
+    )
+    return [event for page in page_iter for event in page['Events']]
+
 def fetch_real_cloudtrail_logs(hours=24, max_events=20):
     """
     Fetch real CloudTrail events from your AWS account
@@ -24,10 +49,12 @@ def fetch_real_cloudtrail_logs(hours=24, max_events=20):
     print("🔍 Fetching REAL CloudTrail logs from AWS...")
     print("=" * 50)
     
-    # Connect to AWS CloudTrail
+    # Connect to AWS CloudTrail - adaptive retries back off when the
+    # parallel window fetches hit the account's API throttle
     cloudtrail = boto3.client(
         'cloudtrail',
-        region_name='us-east-1'
+        region_name='us-east-1',
+        config=Config(retries={'mode': 'adaptive'})
     )
     
     # Time range - last 24 hours
@@ -42,13 +69,24 @@ def fetch_real_cloudtrail_logs(hours=24, max_events=20):
     # Fetch events from CloudTrail
     print("📡 Connecting to AWS CloudTrail...")
     
-    response = cloudtrail.lookup_events(
-        StartTime=start_time,
-        EndTime=end_time,
-        MaxResults=max_events
-    )
-    
-    raw_events = response.get('Events', [])
+    # Fetch time windows in parallel, then keep the newest max_events
+    windows = split_time_range(start_time, end_time, FETCH_WORKERS)
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as executor:
+        pages = list(executor.map(
+            lambda window: _fetch_window(cloudtrail, *window, max_events),
+            windows
+        ))
+    
+    # Windows share their boundary times and lookup_events includes both
+    # ends, so an event on a boundary comes back twice - keep one copy
+    unique_events = {}
+    for page in pages:
+        for event in page:
+            unique_events.setdefault(event['EventId'], event)
+    
+    raw_events = list(unique_events.values())
+    raw_events.sort(key=lambda event: event['EventTime'], reverse=True)
+    raw_events = raw_events[:max_events]
     print(f"✅ Found {len(raw_events)} real events!")
     print()
     
@@ -58,42 +96,47 @@ def fetch_real_cloudtrail_logs(hours=24, max_events=20):
         print("   Or make sure AWS CLI is configured")
         return None
     
-    # Convert to CloudTrail format
-    records = []
+    output_path = "sample_logs/real_cloudtrail_events.json"
+    
+    os.makedirs("sample_logs", exist_ok=True)
+    
+    # Convert to CloudTrail format, writing each record straight to
+    # the file instead of building one big {"Records": [...]} first
+    record_count = 0
     print("📋 Events found:")
     print("-" * 40)
     
-    for event in raw_events:
-        # Parse the CloudTrail event JSON
-        cloud_trail_event = json.loads(
-            event.get('CloudTrailEvent', '{}')
-        )
-        
-        event_name = event.get('EventName', 'Unknown')
-        username = event.get('Username', 'Unknown')
-        event_time = event.get('EventTime', '')
-        
-        # Convert datetime to string if needed
-        if hasattr(event_time, 'strftime'):
-            event_time = event_time.strftime('%Y-%m-%dT%H:%M:%SZ')
+    with open(output_path, 'wb') as f:
+        f.write(b'{\n  "Records": [')
         
-        print(f"  → {event_name} by {username} at {event_time}")
+        for event in raw_events:
+            # Parse the CloudTrail event JSON
+            cloud_trail_event = orjson.loads(
+                event.get('CloudTrailEvent') or b'{}'
+            )
+            
+            event_name = event.get('EventName', 'Unknown')
+            username = event.get('Username', 'Unknown')
+            event_time = event.get('EventTime', '')
+            
+            # Convert datetime to string if needed
+            if hasattr(event_time, 'strftime'):
+                event_time = event_time.strftime('%Y-%m-%dT%H:%M:%SZ')
+            
+            print(f"  → {event_name} by {username} at {event_time}")
+            
+            # orjson writes datetimes natively, so no default=str needed
+            record = orjson.dumps(cloud_trail_event, option=orjson.OPT_INDENT_2)
+            f.write(b',\n    ' if record_count else b'\n    ')
+            f.write(record.replace(b'\n', b'\n    '))
+            record_count += 1
         
-        records.append(cloud_trail_event)
+        f.write(b'\n  ]\n}\n')
     
     print("-" * 40)
     
-    # Save to file
-    output = {"Records": records}
-    output_path = "sample_logs/real_cloudtrail_events.json"
-    
-    os.makedirs("sample_logs", exist_ok=True)
-    
-    with open(output_path, 'w') as f:
-        json.dump(output, f, indent=2, default=str)
-    
     print(f"\n✅ Real logs saved to: {output_path}")
-    print(f"📊 Total events: {len(records)}")
+    print(f"📊 Total events: {record_count}")
     
     return output_path
 